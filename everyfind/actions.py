@@ -19,13 +19,98 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
 import os
+import stat
 import logging
+import functools
 import subprocess
-from pathlib import Path
+from datetime import datetime
 from typing import Optional
 
+from .utils import which
+
 logger = logging.getLogger(__name__)
 
+# Terminal emulators tried in order when none is given explicitly
+_TERMINALS = (
+    'gnome-terminal',
+    'konsole',
+    'xfce4-terminal',
+    'xterm',
+    'terminator',
+    'alacritty',
+    'kitty',
+)
+
+# Arguments that make a terminal start in a given directory ({dir});
+# terminals not listed here are started with their working directory set
+_TERMINAL_ARGS = {
+    'gnome-terminal': ('--working-directory', '{dir}'),
+    'terminator': ('--working-directory', '{dir}'),
+    'konsole': ('--workdir', '{dir}'),
+    'xfce4-terminal': ('--working-directory', '{dir}'),
+    'alacritty': ('--working-directory', '{dir}'),
+    'kitty': ('--working-directory', '{dir}'),
+}
+
+# Native openers per desktop (entries of $XDG_CURRENT_DESKTOP), used
+# instead of the xdg-open shell script when installed
+_DESKTOP_OPENERS = {
+    'GNOME': ('gio', 'open'),
+    'UNITY': ('gio', 'open'),
+    'CINNAMON': ('gio', 'open'),
+    'KDE': ('kde-open5',),
+    'XFCE': ('exo-open',),
+}
+
+# Units used by FileActions._human_readable_size, in steps of 1024
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+
+def _stat_mode(file_path: str) -> Optional[int]:
+    """Return the mode bits of a path (following symlinks), or None if it is missing."""
+    try:
+        return os.stat(file_path).st_mode
+    except OSError:
+        return None
+
+
+def _containing_directory(file_path: str, mode: int) -> str:
+    """Return the parent directory for regular files, otherwise the path itself."""
+    if stat.S_ISREG(mode):
+        return os.path.dirname(file_path) or '.'
+    return file_path
+
+
+@functools.lru_cache(maxsize=1)
+def _file_opener() -> tuple[str, ...]:
+    """Return the command used to open files, detected once per process."""
+    for desktop in os.environ.get('XDG_CURRENT_DESKTOP', '').upper().split(':'):
+        opener = _DESKTOP_OPENERS.get(desktop)
+        if opener is not None and which(opener[0]) is not None:
+            return opener
+    return ('xdg-open',)
+
+
+def _spawn(argv: list[str], cwd: Optional[str] = None) -> None:
+    """Start a detached GUI program that does not inherit our stdio."""
+    subprocess.Popen(
+        argv,
+        cwd=cwd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _default_terminal() -> Optional[str]:
+    """Return the first installed terminal emulator, probed once per process."""
+    for term in _TERMINALS:
+        if which(term) is not None:
+            return term
+    return None
+
 
 class FileActions:
     """File operations: open, terminal, copy path, show details."""
@@ -41,17 +126,15 @@ class FileActions:
         Returns:
             True if successful, False otherwise
         """
-        path = Path(file_path)
-        
-        if not path.exists():
+        if _stat_mode(file_path) is None:
             logger.error(f"File does not exist: {file_path}")
             return False
         
         try:
             if os.name == 'posix':  # Linux/Unix
-                subprocess.Popen(['xdg-open', str(path)])
+                _spawn([*_file_opener(), file_path])
             elif os.name == 'nt':  # Windows
-                os.startfile(str(path))
+                os.startfile(file_path)
             else:
                 logger.error(f"Unsupported OS: {os.name}")
                 return False
@@ -74,47 +157,31 @@ class FileActions:
         Returns:
             True if successful, False otherwise
         """
-        path = Path(file_path)
+        mode = _stat_mode(file_path)
         
-        if not path.exists():
+        if mode is None:
             logger.error(f"Path does not exist: {file_path}")
             return False
         
         # Use parent directory if path is a file
-        directory = path.parent if path.is_file() else path
+        directory = _containing_directory(file_path, mode)
         
         try:
             if terminal is None:
                 # Auto-detect terminal
-                terminals = [
-                    'gnome-terminal',
-                    'konsole',
-                    'xfce4-terminal',
-                    'xterm',
-                    'terminator',
-                    'alacritty',
-                    'kitty'
-                ]
-                
-                for term in terminals:
-                    if FileActions._has_command(term):
-                        terminal = term
-                        break
+                terminal = _default_terminal()
                 
                 if terminal is None:
                     logger.error("No terminal emulator found")
                     return False
             
             # Different terminals have different syntax
-            if terminal in ['gnome-terminal', 'terminator']:
-                subprocess.Popen([terminal, '--working-directory', str(directory)])
-            elif terminal == 'konsole':
-                subprocess.Popen([terminal, '--workdir', str(directory)])
-            elif terminal in ['xfce4-terminal', 'alacritty', 'kitty']:
-                subprocess.Popen([terminal, '--working-directory', str(directory)])
+            args = _TERMINAL_ARGS.get(terminal)
+            if args is not None:
+                _spawn([terminal, *(a.format(dir=directory) for a in args)])
             else:
                 # Fallback: change directory in shell
-                subprocess.Popen([terminal], cwd=str(directory))
+                _spawn([terminal], cwd=directory)
             
             logger.info(f"Opened terminal in: {directory}")
             return True
@@ -125,7 +192,9 @@ class FileActions:
     @staticmethod
     def copy_path_to_clipboard(file_path: str) -> bool:
         """
-        Copy file path to clipboard.
+        Copy file path to clipboard using xclip or xsel.
+        
+        Intended for the CLI; the GTK window uses its own clipboard.
         
         Args:
             file_path: Path to copy
@@ -169,32 +238,38 @@ class FileActions:
         Returns:
             Dictionary with file details
         """
-        path = Path(file_path)
-        
-        if not path.exists():
+        # One lstat for the link flag, plus one stat of the target for symlinks;
+        # all other flags are derived from the mode bits
+        try:
+            st = os.lstat(file_path)
+            is_link = stat.S_ISLNK(st.st_mode)
+            if is_link:
+                st = os.stat(file_path)
+        except FileNotFoundError:
             return {'error': 'File does not exist'}
+        except OSError as e:
+            logger.error(f"Failed to get file details: {e}")
+            return {'error': str(e)}
         
         try:
-            stat = path.stat()
-            
-            from datetime import datetime
+            is_file = stat.S_ISREG(st.st_mode)
             
             details = {
-                'path': str(path.absolute()),
-                'name': path.name,
-                'size': stat.st_size,
-                'size_human': FileActions._human_readable_size(stat.st_size),
-                'modified': datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                'accessed': datetime.fromtimestamp(stat.st_atime).isoformat(),
-                'created': datetime.fromtimestamp(stat.st_ctime).isoformat(),
-                'is_file': path.is_file(),
-                'is_dir': path.is_dir(),
-                'is_link': path.is_symlink(),
-                'permissions': oct(stat.st_mode)[-3:],
+                'path': os.path.abspath(file_path),
+                'name': os.path.basename(file_path),
+                'size': st.st_size,
+                'size_human': FileActions._human_readable_size(st.st_size),
+                'modified': datetime.fromtimestamp(st.st_mtime).isoformat(timespec='seconds'),
+                'accessed': datetime.fromtimestamp(st.st_atime).isoformat(timespec='seconds'),
+                'created': datetime.fromtimestamp(st.st_ctime).isoformat(timespec='seconds'),
+                'is_file': is_file,
+                'is_dir': stat.S_ISDIR(st.st_mode),
+                'is_link': is_link,
+                'permissions': oct(st.st_mode)[-3:],
             }
             
-            if path.is_file():
-                details['extension'] = path.suffix
+            if is_file:
+                details['extension'] = os.path.splitext(file_path)[1]
             
             return details
         except Exception as e:
@@ -212,27 +287,27 @@ class FileActions:
         Returns:
             True if successful, False otherwise
         """
-        path = Path(file_path)
+        mode = _stat_mode(file_path)
         
-        if not path.exists():
+        if mode is None:
             logger.error(f"Path does not exist: {file_path}")
             return False
         
         try:
             # Use parent directory
-            directory = path.parent if path.is_file() else path
+            directory = _containing_directory(file_path, mode)
             
             if FileActions._has_command('nautilus'):  # GNOME
-                subprocess.Popen(['nautilus', str(directory)])
+                _spawn(['nautilus', directory])
             elif FileActions._has_command('dolphin'):  # KDE
-                subprocess.Popen(['dolphin', str(directory)])
+                _spawn(['dolphin', directory])
             elif FileActions._has_command('thunar'):  # XFCE
-                subprocess.Popen(['thunar', str(directory)])
+                _spawn(['thunar', directory])
             elif FileActions._has_command('pcmanfm'):  # LXDE
-                subprocess.Popen(['pcmanfm', str(directory)])
+                _spawn(['pcmanfm', directory])
             else:
-                # Fallback to xdg-open
-                subprocess.Popen(['xdg-open', str(directory)])
+                # Fallback to the desktop's default opener
+                _spawn([*_file_opener(), directory])
             
             logger.info(f"Opened file manager for: {directory}")
             return True
@@ -243,17 +318,15 @@ class FileActions:
     @staticmethod
     def _has_command(cmd: str) -> bool:
         """Check if a command is available in PATH."""
-        import shutil
-        return shutil.which(cmd) is not None
+        return which(cmd) is not None
     
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def _human_readable_size(size: int) -> str:
         """Convert bytes to human-readable format."""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size < 1024.0:
-                return f"{size:.2f} {unit}"
-            size /= 1024.0
-        return f"{size:.2f} PB"
+        # Each unit is 10 bits wide, so the unit index follows from bit_length()
+        index = min((max(size, 1).bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+        return f"{size / (1 << (index * 10)):.2f} {_SIZE_UNITS[index]}"
 
 
 if __name__ == "__main__":
@@ -24,7 +24,7 @@ import sys
 from pathlib import Path
 
 from . import __version__
-from .indexer import FileIndexer
+from .indexer import FileIndexer, DEFAULT_SCAN_THREADS, collapse_roots
 from .search_backend import get_search_backend
 from .actions import FileActions
 
@@ -42,12 +42,17 @@ def cmd_index(args):
     """Index a directory."""
     indexer = FileIndexer(args.db)
     
-    paths = args.path if args.path else [str(Path.home())]
+    # Roots nested inside another root would be scanned twice
+    paths = collapse_roots(args.path if args.path else [str(Path.home())], args.exclude)
     
     total_indexed = 0
     for path in paths:
         print(f"Indexing: {path}")
-        count = indexer.index_directory(path, exclude_patterns=args.exclude)
+        count = indexer.index_directory(
+            path,
+            exclude_patterns=args.exclude,
+            scan_threads=args.scan_threads
+        )
         total_indexed += count
         print(f"Indexed {count} files from {path}")
     
@@ -55,24 +60,44 @@ def cmd_index(args):
     indexer.close()
 
 
+def _uses_fzf_syntax(query: str) -> bool:
+    """Check if a query uses fzf's extended search operators (^a, a$, 'a, !a, |)."""
+    return any(
+        word == '|' or word[0] in "^'!" or word.endswith('$')
+        for word in query.split()
+    )
+
+
 def cmd_search(args):
     """Search for files."""
     indexer = FileIndexer(args.db)
     
-    # Get all paths from index
-    all_paths = indexer.get_all_paths()
+    # With --prefilter, narrow the candidates to paths containing the query
+    # words via the full-text index. Otherwise, or when that finds nothing or
+    # the query uses fzf operators, stream every indexed path to the backend
+    # so fuzzy matches are not lost
+    candidates = None
+    if args.prefilter and args.query and not _uses_fzf_syntax(args.query):
+        candidates = indexer.search_fts(args.query, limit=None) or None
     
-    if not all_paths:
-        print("No files in index. Run 'everyfind index' first.")
-        indexer.close()
-        return
+    if candidates is None:
+        count = indexer.count_files()
+        
+        if not count:
+            print("No files in index. Run 'everyfind index' first.")
+            indexer.close()
+            return
+        
+        candidates = indexer.iter_all_paths()
+    else:
+        count = len(candidates)
     
-    print(f"Searching {len(all_paths)} files...")
+    print(f"Searching {count} files...")
     
     # Use fzf for fuzzy search
     backend = get_search_backend()
     result = backend.search(
-        all_paths,
+        candidates,
         multi=args.multi,
         prompt="Everyfind: ",
         query=args.query or ""
@@ -116,10 +141,8 @@ def cmd_stats(args):
     """Show index statistics."""
     indexer = FileIndexer(args.db)
     
-    all_paths = indexer.get_all_paths()
-    
     print(f"Database: {indexer.db_path}")
-    print(f"Total files: {len(all_paths)}")
+    print(f"Total files: {indexer.count_files()}")
     
     if indexer.db_path.exists():
         size = indexer.db_path.stat().st_size
@@ -137,7 +160,8 @@ def main():
 Examples:
   everyfind index /home/user              # Index home directory
   everyfind search                        # Interactive fuzzy search
-  everyfind search -q "*.py"              # Search with initial query
+  everyfind search -q ".py$"              # Search with initial query
+  everyfind search -p -q "notes"          # Only list paths containing "notes"
   everyfind gui                           # Launch GTK GUI
   everyfind stats                         # Show index statistics
         """
@@ -174,7 +198,14 @@ Examples:
         '--exclude',
         nargs='+',
         default=['.git', '__pycache__', '.venv', 'venv', 'node_modules'],
-        help='Patterns to exclude (default: .git __pycache__ .venv venv node_modules)'
+        help='Directory names or paths to exclude (default: .git __pycache__ .venv venv node_modules)'
+    )
+    parser_index.add_argument(
+        '--scan-threads',
+        type=int,
+        default=DEFAULT_SCAN_THREADS,
+        metavar='N',
+        help=f'Threads reading directories in parallel (default: {DEFAULT_SCAN_THREADS}, 1 disables)'
     )
     parser_index.set_defaults(func=cmd_index)
     
@@ -185,6 +216,13 @@ Examples:
         type=str,
         help='Initial search query'
     )
+    parser_search.add_argument(
+        '-p', '--prefilter',
+        action='store_true',
+        help='Only list paths containing every word of the query (faster on large indexes, '
+             'but drops fuzzy matches; the first use builds a full-text index, which '
+             'also makes later indexing slower)'
+    )
     parser_search.add_argument(
         '-m', '--multi',
         action='store_true',
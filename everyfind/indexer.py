@@ -21,12 +21,333 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 import os
 import sqlite3
 import logging
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Generator
-from datetime import datetime
+from typing import Optional, Generator, Iterator
+from itertools import islice
 
 logger = logging.getLogger(__name__)
 
+# Stored in PRAGMA user_version; databases with an older version are
+# migrated when they are opened (see FileIndexer._migrate_schema)
+_SCHEMA_VERSION = 2
+
+_FILES_TABLE = """
+    CREATE TABLE IF NOT EXISTS files (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        filename TEXT NOT NULL,
+        size INTEGER,
+        modified REAL,
+        indexed_at REAL NOT NULL
+    )
+"""
+
+# Rows collected before they are written with a single executemany()
+_INSERT_BATCH_SIZE = 5000
+
+# Current Unix time with fractions of a second, computed by SQLite so that
+# indexed_at is not bound per row (unixepoch('subsec') needs SQLite 3.42)
+_NOW_SQL = "(julianday('now') - 2440587.5) * 86400.0"
+
+# Both statements take the (path, filename, size, modified) tuples yielded
+# by scan_directory() as they are
+_INSERT_SQL = f"""
+    INSERT OR REPLACE INTO files (path, filename, size, modified, indexed_at)
+    VALUES (?, ?, ?, ?, {_NOW_SQL})
+"""
+
+_UPDATE_SQL = f"""
+    UPDATE files SET filename = ?2, size = ?3, modified = ?4, indexed_at = {_NOW_SQL}
+    WHERE path = ?1
+"""
+
+_DELETE_SQL = "DELETE FROM files WHERE path = ?"
+
+# Default number of scan threads; directory reads are I/O-bound, so this
+# is deliberately higher than the number of cores
+DEFAULT_SCAN_THREADS = min(32, (os.cpu_count() or 1) * 4)
+
+# Trees whose root has at most this many subdirectories are scanned on the
+# calling thread, where a thread pool would only add overhead
+_PARALLEL_MIN_SUBDIRS = 4
+
+# Full-text index of all paths using the trigram tokenizer, so substring
+# queries are answered from an index; the triggers keep it in sync with files.
+# It is only created by the first search_fts() call, as maintaining it makes
+# every indexed file several times more expensive to write
+_FTS_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+        path, tokenize='trigram', content='files', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS files_fts_ai AFTER INSERT ON files BEGIN
+        INSERT INTO files_fts(rowid, path) VALUES (new.id, new.path);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS files_fts_ad AFTER DELETE ON files BEGIN
+        INSERT INTO files_fts(files_fts, rowid, path) VALUES ('delete', old.id, old.path);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS files_fts_au AFTER UPDATE OF path ON files BEGIN
+        INSERT INTO files_fts(files_fts, rowid, path) VALUES ('delete', old.id, old.path);
+        INSERT INTO files_fts(rowid, path) VALUES (new.id, new.path);
+    END
+    """,
+)
+
+_FTS_TRIGGERS = ('files_fts_ai', 'files_fts_ad', 'files_fts_au')
+
+# Trigrams cannot match shorter query words
+_FTS_MIN_WORD = 3
+
+# Where supported, directories are scanned through an open file descriptor so
+# every stat() is a fstatat() relative to it instead of a full path lookup
+_SCAN_BY_FD = os.scandir in os.supports_fd and hasattr(os, 'O_DIRECTORY')
+_DIR_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0) | getattr(os, 'O_CLOEXEC', 0)
+
+# Directories skipped by scan_directory when no exclude patterns are given
+_DEFAULT_EXCLUDES = ['.git', '__pycache__', '.venv', 'venv', 'node_modules']
+
+# Narrowed queries re-check the previous matches instead of rescanning the
+# whole blob, as long as there were at most this many of them
+_REFINE_MAX_LINES = 20000
+
+# Matches of this many recent queries are remembered for retyped or
+# backspaced queries; larger results are cheaper to rescan than to keep
+_RECENT_SEARCHES = 64
+_RECENT_MAX_LINES = 20000
+
+
+def _exclude_set(exclude_patterns: list) -> set:
+    """
+    Build the set used to prune directories from exclude patterns.
+    
+    Names never contain a slash and resolved paths always do, so both
+    kinds share one set and a directory costs two lookups.
+    
+    Args:
+        exclude_patterns: Directory names or paths
+    
+    Returns:
+        Set of directory names and resolved directory paths
+    """
+    return {
+        os.path.realpath(os.path.expanduser(p)) if '/' in p else p
+        for p in exclude_patterns
+    }
+
+
+def collapse_roots(paths: list[str], exclude_patterns: Optional[list] = None) -> list[str]:
+    """
+    Drop roots that are already covered by another root in the list.
+    
+    A root inside another root would otherwise be walked twice. It is kept
+    when a directory on the way down to it is excluded, since the outer
+    scan does not reach it then.
+    
+    Args:
+        paths: Root directories to index
+        exclude_patterns: Exclude patterns as passed to scan_directory
+    
+    Returns:
+        Resolved roots, sorted and without duplicates or nested roots
+    """
+    if exclude_patterns is None:
+        exclude_patterns = _DEFAULT_EXCLUDES
+    exclude = _exclude_set(exclude_patterns)
+    
+    kept: list[str] = []
+    for root in sorted({os.path.realpath(os.path.expanduser(p)) for p in paths}):
+        covered = False
+        for outer in kept:
+            prefix = outer.rstrip('/') + '/'
+            if not root.startswith(prefix):
+                continue
+            # Walk down from the outer root like the scanner would
+            covered = True
+            current = outer.rstrip('/')
+            for name in root[len(prefix):].split('/'):
+                current = f"{current}/{name}"
+                if name in exclude or current in exclude:
+                    covered = False
+                    break
+            if covered:
+                break
+        if covered:
+            logger.info(f"Skipping {root}, it is inside another indexed root")
+        else:
+            kept.append(root)
+    return kept
+
+
+def _scan_dir(
+    dirpath: str,
+    exclude: set,
+    skipped: Optional[list] = None
+) -> tuple[list[tuple], list[str]]:
+    """
+    Read one directory.
+    
+    Args:
+        dirpath: Directory to read
+        exclude: Directory names and full directory paths not to descend into
+        skipped: If given, excluded subdirectories and dirpath itself if it
+            cannot be read are appended to it
+    
+    Returns:
+        Tuple of (file tuples as yielded by scan_directory, subdirectories to scan next)
+    """
+    files = []
+    subdirs = []
+    # Entries of a descriptor scan only carry their name, so paths are built here
+    prefix = dirpath if dirpath.endswith('/') else dirpath + '/'
+    fd = None
+    try:
+        if _SCAN_BY_FD:
+            fd = os.open(dirpath, _DIR_OPEN_FLAGS)
+            entries = os.scandir(fd)
+        else:
+            entries = os.scandir(dirpath)
+    except OSError as e:
+        if fd is not None:
+            os.close(fd)
+        logger.warning(f"Cannot access {dirpath}: {e}")
+        if skipped is not None:
+            skipped.append(dirpath)
+        return files, subdirs
+    
+    try:
+        with entries:
+            for entry in entries:
+                name = entry.name
+                try:
+                    if entry.is_dir():
+                        # Like os.walk(), do not descend into symlinked directories
+                        subpath = prefix + name
+                        if name in exclude or subpath in exclude:
+                            if skipped is not None:
+                                skipped.append(subpath)
+                        elif not entry.is_symlink():
+                            subdirs.append(subpath)
+                        continue
+                    
+                    stat = entry.stat()
+                    
+                    files.append((prefix + name, name, stat.st_size, stat.st_mtime))
+                except OSError as e:
+                    logger.warning(f"Cannot access {prefix + name}: {e}")
+                    continue
+    finally:
+        if fd is not None:
+            os.close(fd)
+    return files, subdirs
+
+
+def _is_below(path: str, dirs: set, root: str) -> bool:
+    """
+    Check if a path lies in one of a set of directories below root.
+    
+    Args:
+        path: File path below root
+        dirs: Directory paths (without trailing slash)
+        root: Directory the walk up from path stops at (included in the check)
+    
+    Returns:
+        True if an ancestor directory of path, up to root, is in dirs
+    """
+    if not dirs:
+        return False
+    parent = os.path.dirname(path)
+    while len(parent) > len(root):
+        if parent in dirs:
+            return True
+        parent = os.path.dirname(parent)
+    return parent in dirs
+
+
+def _scan_parallel(
+    dirs: list[str],
+    exclude: set,
+    threads: int,
+    skipped: Optional[list] = None
+) -> Iterator[tuple]:
+    """
+    Scan directory trees with a pool of threads, yielding files as they come in.
+    
+    Each task reads one directory; its subdirectories are submitted as new
+    tasks, and the scan ends when no task is left.
+    """
+    with ThreadPoolExecutor(max_workers=threads, thread_name_prefix='scan') as pool:
+        pending = {pool.submit(_scan_dir, d, exclude, skipped) for d in dirs}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    files, subdirs = future.result()
+                    pending.update(pool.submit(_scan_dir, d, exclude, skipped) for d in subdirs)
+                    yield from files
+        finally:
+            # Stop queued work if the consumer gives up early
+            for future in pending:
+                future.cancel()
+
+
+def _match_lines(blob: bytes, offsets: array, needle: bytes) -> list[int]:
+    """
+    Find the lines of a newline-separated blob that contain needle.
+    
+    Args:
+        blob: Lines joined with b'\\n'
+        offsets: Start offset of every line in blob
+        needle: Byte string to search for (must not contain b'\\n')
+    
+    Returns:
+        Indices of matching lines in ascending order
+    """
+    find = blob.find
+    last = len(offsets) - 1
+    lines = []
+    if last < 0:
+        # An empty blob still "contains" the empty needle at 0
+        return lines
+    
+    pos = find(needle)
+    while pos != -1:
+        line = bisect_right(offsets, pos) - 1
+        lines.append(line)
+        if line == last:
+            break
+        # Continue at the start of the next line
+        pos = find(needle, offsets[line + 1])
+    return lines
+
+
+def _join_lines(lines: list[bytes]) -> tuple[bytes, array]:
+    """Join lines with b'\\n' and return the blob with the start offset of every line."""
+    offsets = array('q')
+    pos = 0
+    for line in lines:
+        offsets.append(pos)
+        pos += len(line) + 1
+    return b'\n'.join(lines), offsets
+
+
+def _get_line(blob: bytes, offsets: array, line: int) -> bytes:
+    """Return one line of a newline-separated blob (without the newline)."""
+    start = offsets[line]
+    if line + 1 < len(offsets):
+        return blob[start:offsets[line + 1] - 1]
+    return blob[start:]
+
 
 class FileIndexer:
     """Recursively scan directories and store file paths in SQLite."""
@@ -45,48 +366,201 @@ class FileIndexer:
         
         self.db_path = Path(db_path)
         self.conn: Optional[sqlite3.Connection] = None
+        
+        # In-memory search data, built lazily from the index (see search_files)
+        self._search_paths: list[str] = []
+        self._search_blob: Optional[bytes] = None
+        self._search_offsets = array('q')
+        self._search_data_version: Optional[int] = None
+        self._unicode_blob: Optional[bytes] = None
+        self._unicode_offsets = array('q')
+        self._last_unicode = False
+        self._last_words: list[bytes] = []
+        self._last_lines: Optional[list[int]] = None
+        self._recent_searches: OrderedDict[tuple, array] = OrderedDict()
+        
+        # Whether the trigram full-text index exists (created by search_fts)
+        self.has_fts = False
+        
         self._init_database()
     
     def _init_database(self) -> None:
         """Initialize the SQLite database with required schema."""
-        self.conn = sqlite3.connect(str(self.db_path))
+        # Autocommit mode: the sqlite3 module does not open transactions on its
+        # own, all multi-statement writes go through _bulk_txn()
+        self.conn = sqlite3.connect(
+            str(self.db_path),
+            isolation_level=None,
+            cached_statements=256
+        )
         cursor = self.conn.cursor()
         
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS files (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                path TEXT NOT NULL UNIQUE,
-                filename TEXT NOT NULL,
-                size INTEGER,
-                modified REAL,
-                indexed_at REAL NOT NULL
-            )
+        # WAL turns commits into appends instead of journal rewrites + fsyncs,
+        # and lets readers (e.g. the GUI) run while an index is written
+        cursor.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-65536;
+            PRAGMA mmap_size=268435456;
+            PRAGMA recursive_triggers=ON;
         """)
         
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_filename ON files(filename)
-        """)
+        # A current schema is only read, so opening the index while another
+        # process writes to it does not wait for that write transaction
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version < _SCHEMA_VERSION:
+            self._migrate_schema(version)
+            
+            with self._bulk_txn() as cursor:
+                # The UNIQUE constraint already indexes path, and a plain INTEGER
+                # PRIMARY KEY reuses the rowid without a sqlite_sequence update per insert
+                cursor.execute(_FILES_TABLE)
+                
+                # Covers get_all_paths(): rows come out in name order with their
+                # path, without a sort or a lookup in the table
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_files_cover
+                    ON files(filename COLLATE NOCASE, path)
+                """)
+                
+                cursor.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
         
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_path ON files(path)
-        """)
+        self.has_fts = self._init_fts()
+        logger.info(f"Database initialized at {self.db_path}")
+    
+    def _migrate_schema(self, version: int) -> None:
+        """
+        Bring a database written by an older version to the current schema.
         
+        Args:
+            version: Schema version stored in the database (PRAGMA user_version)
+        """
+        row = self.conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'files'"
+        ).fetchone()
+        if row is None:
+            return
+        
+        logger.info(f"Migrating index from schema version {version} to {_SCHEMA_VERSION}")
+        with self._bulk_txn() as cursor:
+            if version < 1:
+                # Recreated (and the full-text index rebuilt) by _create_fts
+                for name in _FTS_TRIGGERS:
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+                cursor.execute("DROP INDEX IF EXISTS idx_path")
+                
+                if "AUTOINCREMENT" in row[0].upper():
+                    cursor.execute("ALTER TABLE files RENAME TO files_old")
+                    cursor.execute(_FILES_TABLE)
+                    cursor.execute("""
+                        INSERT INTO files (id, path, filename, size, modified, indexed_at)
+                        SELECT id, path, filename, size, modified, indexed_at FROM files_old
+                    """)
+                    cursor.execute("DROP TABLE files_old")
+            
+            if version < 2:
+                # Superseded by idx_files_cover
+                cursor.execute("DROP INDEX IF EXISTS idx_filename")
+    
+    def _init_fts(self) -> bool:
+        """
+        Check whether the trigram full-text index has been created.
+        
+        Returns:
+            True if the full-text index and its triggers exist and this
+            SQLite build can read them
+        """
+        cursor = self.conn.cursor()
+        placeholders = ", ".join("?" * len(_FTS_TRIGGERS))
+        existing = cursor.execute(
+            f"SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name IN ({placeholders})",
+            _FTS_TRIGGERS
+        ).fetchone()[0]
+        if not existing:
+            return False
+        
+        if existing == len(_FTS_TRIGGERS):
+            # Only read here, so opening the index does not take the write
+            # lock an index run may be holding
+            try:
+                cursor.execute("SELECT rowid FROM files_fts LIMIT 0")
+                return True
+            except sqlite3.OperationalError as e:
+                logger.info(f"Full-text index not available: {e}")
+        
+        # Triggers left by a build with FTS5 would make every write fail, and
+        # an incomplete set leaves the index stale; _create_fts starts over
+        try:
+            for name in _FTS_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Cannot remove full-text index triggers: {e}")
+        return False
+    
+    def _create_fts(self) -> bool:
+        """
+        Create the trigram full-text index and its triggers, and fill it.
+        
+        INSERT OR REPLACE deletes the old row of a path before inserting the
+        new one; the delete trigger only sees that with recursive_triggers on.
+        
+        Returns:
+            True if the full-text index was created, False if this SQLite
+            build lacks FTS5 or the trigram tokenizer, or the database is busy
+        """
+        logger.info("Building the full-text index")
+        # Do not wait for an index run to finish; the caller falls back to
+        # listing all paths and the next search tries again
+        busy_timeout = self.conn.execute("PRAGMA busy_timeout").fetchone()[0]
+        self.conn.execute("PRAGMA busy_timeout = 0")
+        try:
+            with self._bulk_txn() as cursor:
+                for statement in _FTS_SCHEMA:
+                    cursor.execute(statement)
+                cursor.execute("INSERT INTO files_fts(files_fts) VALUES ('rebuild')")
+        except sqlite3.OperationalError as e:
+            logger.info(f"Full-text index not available: {e}")
+            return False
+        finally:
+            self.conn.execute(f"PRAGMA busy_timeout = {int(busy_timeout)}")
+        return True
+    
+    @contextmanager
+    def _bulk_txn(self) -> Iterator[sqlite3.Cursor]:
+        """Run a block of writes in a single IMMEDIATE transaction."""
+        cursor = self.conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+        except BaseException:
+            self.conn.rollback()
+            raise
         self.conn.commit()
-        logger.info(f"Database initialized at {self.db_path}")
     
-    def scan_directory(self, root_path: str, exclude_patterns: Optional[list] = None) -> Generator[dict, None, None]:
+    def scan_directory(
+        self,
+        root_path: str,
+        exclude_patterns: Optional[list] = None,
+        scan_threads: int = DEFAULT_SCAN_THREADS,
+        skipped: Optional[list] = None
+    ) -> Generator[tuple, None, None]:
         """
         Recursively scan a directory and yield file information.
         
         Args:
             root_path: Root directory to scan
-            exclude_patterns: List of directory/file patterns to exclude (e.g., ['.git', '__pycache__'])
+            exclude_patterns: Directory names (e.g. ['.git', '__pycache__']) or
+                paths (e.g. ['/home/user/mnt']) whose subtrees are skipped
+            scan_threads: Number of threads reading directories (1 scans serially)
+            skipped: If given, directories that were excluded or could not be
+                read are appended to it
         
         Yields:
-            Dictionary with file information (path, filename, size, modified)
+            Tuple of (path, filename, size, modified) per file
         """
         if exclude_patterns is None:
-            exclude_patterns = ['.git', '__pycache__', '.venv', 'venv', 'node_modules']
+            exclude_patterns = _DEFAULT_EXCLUDES
         
         root_path = Path(root_path).resolve()
         
@@ -100,32 +574,39 @@ class FileIndexer:
         
         logger.info(f"Starting scan of {root_path}")
         
-        for dirpath, dirnames, filenames in os.walk(root_path):
-            # Filter out excluded directories
-            dirnames[:] = [d for d in dirnames if d not in exclude_patterns]
-            
-            for filename in filenames:
-                try:
-                    filepath = Path(dirpath) / filename
-                    stat = filepath.stat()
-                    
-                    yield {
-                        'path': str(filepath),
-                        'filename': filename,
-                        'size': stat.st_size,
-                        'modified': stat.st_mtime
-                    }
-                except (OSError, PermissionError) as e:
-                    logger.warning(f"Cannot access {filepath}: {e}")
-                    continue
+        # Fan out to a thread pool only when the root has enough subtrees;
+        # otherwise walk an explicit stack of directories on this thread
+        exclude = _exclude_set(exclude_patterns)
+        files, stack = _scan_dir(str(root_path), exclude, skipped)
+        yield from files
+        
+        if scan_threads > 1 and len(stack) > _PARALLEL_MIN_SUBDIRS:
+            yield from _scan_parallel(stack, exclude, scan_threads, skipped)
+            return
+        
+        while stack:
+            files, subdirs = _scan_dir(stack.pop(), exclude, skipped)
+            stack.extend(subdirs)
+            yield from files
     
-    def index_directory(self, root_path: str, exclude_patterns: Optional[list] = None) -> int:
+    def index_directory(
+        self,
+        root_path: str,
+        exclude_patterns: Optional[list] = None,
+        scan_threads: int = DEFAULT_SCAN_THREADS
+    ) -> int:
         """
         Index all files in a directory and store in database.
         
+        Re-indexing only writes files that are new or whose modification
+        time changed, and removes entries of files that no longer exist.
+        Entries below excluded or unreadable directories are kept, e.g.
+        files indexed from a root inside an excluded directory.
+        
         Args:
             root_path: Root directory to index
-            exclude_patterns: List of directory/file patterns to exclude
+            exclude_patterns: Directory names or paths to exclude (see scan_directory)
+            scan_threads: Number of threads reading directories (1 scans serially)
         
         Returns:
             Number of files indexed
@@ -133,78 +614,288 @@ class FileIndexer:
         if self.conn is None:
             raise RuntimeError("Database not initialized")
         
-        cursor = self.conn.cursor()
+        root = str(Path(root_path).resolve())
         indexed_count = 0
-        current_time = datetime.now().timestamp()
         
-        for file_info in self.scan_directory(root_path, exclude_patterns):
-            try:
-                cursor.execute("""
-                    INSERT OR REPLACE INTO files (path, filename, size, modified, indexed_at)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    file_info['path'],
-                    file_info['filename'],
-                    file_info['size'],
-                    file_info['modified'],
-                    current_time
-                ))
-                indexed_count += 1
+        # Rows are only written for new and modified files; paths still left
+        # in the snapshot after the scan no longer exist
+        inserts: list[tuple] = []
+        updates: list[tuple] = []
+        counts = {_INSERT_SQL: 0, _UPDATE_SQL: 0, _DELETE_SQL: 0}
+        
+        def flush(sql: str, batch: list[tuple]) -> int:
+            stored = self._write_batch(cursor, sql, batch)
+            counts[sql] += stored
+            batch.clear()
+            return stored
+        
+        skipped: list[str] = []
+        
+        with self._bulk_txn() as cursor:
+            snapshot = self._load_mtime_snapshot(root)
+            
+            for file_info in self.scan_directory(root, exclude_patterns, scan_threads, skipped):
+                known = snapshot.pop(file_info[0], None)
+                if known is None:
+                    inserts.append(file_info)
+                elif known != file_info[3]:
+                    updates.append(file_info)
+                else:
+                    indexed_count += 1
+                    continue
                 
-                if indexed_count % 1000 == 0:
-                    self.conn.commit()
+                if len(inserts) >= _INSERT_BATCH_SIZE:
+                    indexed_count += flush(_INSERT_SQL, inserts)
                     logger.info(f"Indexed {indexed_count} files...")
-                
-            except sqlite3.Error as e:
-                logger.error(f"Database error for {file_info['path']}: {e}")
-                continue
+                elif len(updates) >= _INSERT_BATCH_SIZE:
+                    indexed_count += flush(_UPDATE_SQL, updates)
+                    logger.info(f"Indexed {indexed_count} files...")
+            
+            indexed_count += flush(_INSERT_SQL, inserts)
+            indexed_count += flush(_UPDATE_SQL, updates)
+            
+            # A missing root (e.g. an unmounted drive) keeps its old entries,
+            # and so do directories the scan did not read
+            if snapshot and os.path.isdir(root):
+                skipped_dirs = set(skipped)
+                flush(_DELETE_SQL, [
+                    (path,) for path in snapshot
+                    if not _is_below(path, skipped_dirs, root)
+                ])
         
-        self.conn.commit()
-        logger.info(f"Indexing complete. Total files indexed: {indexed_count}")
+        self._search_blob = None
+        logger.info(
+            f"Indexing complete. Total files indexed: {indexed_count} "
+            f"({counts[_INSERT_SQL]} new, {counts[_UPDATE_SQL]} changed, "
+            f"{counts[_DELETE_SQL]} removed)"
+        )
         return indexed_count
     
+    def _load_mtime_snapshot(self, root: str) -> dict[str, float]:
+        """
+        Load the modification times of all indexed files below a directory.
+        
+        Args:
+            root: Resolved directory path
+        
+        Returns:
+            Dictionary mapping file path to its indexed modification time
+        """
+        # Paths below root sort between "root/" and "root0" ('0' follows '/'),
+        # so the range is answered from the path index
+        prefix = root.rstrip('/') + '/'
+        cursor = self.conn.execute(
+            "SELECT path, modified FROM files WHERE path >= ? AND path < ?",
+            (prefix, prefix[:-1] + '0')
+        )
+        return dict(cursor)
+    
+    @staticmethod
+    def _write_batch(cursor: sqlite3.Cursor, sql: str, batch: list[tuple]) -> int:
+        """
+        Write a batch of file rows, returning the number of rows stored.
+        
+        Every row starts with the file path. If the batch fails as a whole,
+        rows are retried one by one so a single bad row (e.g. an
+        unencodable file name) only skips itself.
+        """
+        try:
+            cursor.executemany(sql, batch)
+            return len(batch)
+        except (sqlite3.Error, UnicodeEncodeError):
+            pass
+        
+        stored = 0
+        for row in batch:
+            try:
+                cursor.execute(sql, row)
+                stored += 1
+            except (sqlite3.Error, UnicodeEncodeError) as e:
+                logger.error(f"Database error for {row[0]!r}: {e}")
+        return stored
+    
     def get_all_paths(self) -> list[str]:
         """
         Retrieve all file paths from the database.
         
         Returns:
-            List of all indexed file paths
+            List of all indexed file paths, ordered by filename (case-insensitive)
         """
         if self.conn is None:
             raise RuntimeError("Database not initialized")
         
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT path FROM files ORDER BY filename")
-        return [row[0] for row in cursor.fetchall()]
+        # Iterating the cursor frees each row tuple right away, where
+        # fetchall() would hold all of them next to the result list
+        return list(self.iter_all_paths())
+    
+    def iter_all_paths(self) -> Iterator[str]:
+        """
+        Iterate over all indexed file paths without loading them into a list.
+        
+        Yields:
+            Indexed file paths, ordered by filename (case-insensitive)
+        """
+        if self.conn is None:
+            raise RuntimeError("Database not initialized")
+        
+        cursor = self.conn.execute("SELECT path FROM files ORDER BY filename COLLATE NOCASE")
+        for (path,) in cursor:
+            yield path
+    
+    def count_files(self) -> int:
+        """Return the number of indexed files."""
+        if self.conn is None:
+            raise RuntimeError("Database not initialized")
+        
+        return self.conn.execute("SELECT count(*) FROM files").fetchone()[0]
     
     def search_files(self, pattern: str) -> list[str]:
         """
-        Search for files matching a pattern (SQL LIKE).
+        Search for files whose path contains all words of a pattern.
+        
+        Matching is case-insensitive. All indexed paths are kept in memory
+        as one lowercased byte string, so a search is a series of C-level
+        bytes.find() calls instead of a row-by-row table scan. ASCII queries
+        use a blob folded with bytes.lower(); queries with other characters
+        use a second, Unicode-lowercased blob that is built on first use.
         
         Args:
-            pattern: Search pattern (supports SQL wildcards %)
+            pattern: Whitespace-separated substrings that must all occur
         
         Returns:
-            List of matching file paths
+            List of matching file paths, ordered by filename (case-insensitive)
         """
         if self.conn is None:
             raise RuntimeError("Database not initialized")
         
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT path FROM files WHERE filename LIKE ? OR path LIKE ? ORDER BY filename",
-            (f"%{pattern}%", f"%{pattern}%")
+        self._ensure_search_blob()
+        unicode_query = not pattern.isascii()
+        if unicode_query:
+            blob, offsets = self._unicode_search_data()
+            words = [w.lower().encode('utf-8') for w in pattern.split()]
+        else:
+            blob, offsets = self._search_blob, self._search_offsets
+            words = [w.encode('ascii').lower() for w in pattern.split()]
+        words.sort(key=len, reverse=True)
+        
+        # Word order does not change the result, so it is not part of the key
+        key = (unicode_query, *sorted(words))
+        last_lines = self._last_lines
+        lines = self._recent_searches.get(key)
+        cached = lines is not None
+        if cached:
+            self._recent_searches.move_to_end(key)
+        elif (last_lines is not None and len(last_lines) <= _REFINE_MAX_LINES
+                and unicode_query == self._last_unicode
+                and all(any(old in new for new in words) for old in self._last_words)):
+            # Every previous word is part of a new one (e.g. the user kept
+            # typing), so only the previous matches can still match
+            lines = [
+                i for i in last_lines
+                if all(w in _get_line(blob, offsets, i) for w in words)
+            ]
+        else:
+            # Scan the blob once for the longest (most selective) word and
+            # only check the remaining words on the lines it matched
+            lines = _match_lines(blob, offsets, words[0] if words else b'')
+            if len(words) > 1:
+                others = words[1:]
+                lines = [
+                    i for i in lines
+                    if all(w in _get_line(blob, offsets, i) for w in others)
+                ]
+        
+        if not cached and len(lines) <= _RECENT_MAX_LINES:
+            self._recent_searches[key] = array('q', lines)
+            if len(self._recent_searches) > _RECENT_SEARCHES:
+                self._recent_searches.popitem(last=False)
+        
+        self._last_words = words
+        self._last_lines = lines
+        self._last_unicode = unicode_query
+        
+        paths = self._search_paths
+        return [paths[i] for i in lines]
+    
+    def search_fts(self, query: str, limit: Optional[int] = 10000) -> Optional[list[str]]:
+        """
+        Search for files whose path contains all words of a query, using the
+        trigram full-text index.
+        
+        Matching is case-insensitive. Words shorter than three characters
+        cannot use the index and are checked on the matched paths instead.
+        The index is created by the first call, and kept up to date by
+        index_directory from then on.
+        
+        Args:
+            query: Whitespace-separated substrings that must all occur
+            limit: Maximum number of paths to return (None for all)
+        
+        Returns:
+            List of matching file paths, best matches first, or None if the
+            index is unavailable or no word is long enough to use it
+        """
+        if self.conn is None:
+            raise RuntimeError("Database not initialized")
+        
+        words = query.split()
+        long_words = [w for w in words if len(w) >= _FTS_MIN_WORD]
+        if not long_words:
+            return None
+        if not self.has_fts:
+            self.has_fts = self._create_fts()
+            if not self.has_fts:
+                return None
+        
+        # Quote every word so it is matched as a literal substring
+        match = " AND ".join('"' + w.replace('"', '""') + '"' for w in long_words)
+        short_words = [w.lower() for w in words if len(w) < _FTS_MIN_WORD]
+        
+        cursor = self.conn.execute(
+            "SELECT path FROM files_fts WHERE files_fts MATCH ? ORDER BY rank",
+            (match,)
         )
-        return [row[0] for row in cursor.fetchall()]
+        paths = (row[0] for row in cursor)
+        if short_words:
+            paths = (p for p in paths if all(w in p.lower() for w in short_words))
+        return list(islice(paths, limit))
+    
+    def _ensure_search_blob(self) -> None:
+        """(Re)build the in-memory search data if the index has changed."""
+        # data_version changes whenever another connection commits to the database
+        data_version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._search_blob is not None and data_version == self._search_data_version:
+            return
+        
+        paths = self.get_all_paths()
+        blob, offsets = _join_lines([p.encode('utf-8') for p in paths])
+        
+        self._search_paths = paths
+        # bytes.lower() only folds ASCII, so offsets stay valid
+        self._search_blob = blob.lower()
+        self._search_offsets = offsets
+        self._search_data_version = data_version
+        self._unicode_blob = None
+        self._last_lines = None
+        self._recent_searches.clear()
+        logger.debug(f"Search data rebuilt for {len(paths)} paths")
+    
+    def _unicode_search_data(self) -> tuple[bytes, array]:
+        """Return the blob of Unicode-lowercased paths and its line offsets."""
+        if self._unicode_blob is None:
+            self._unicode_blob, self._unicode_offsets = _join_lines(
+                [p.lower().encode('utf-8') for p in self._search_paths]
+            )
+        return self._unicode_blob, self._unicode_offsets
     
     def clear_index(self) -> None:
         """Clear all entries from the index."""
         if self.conn is None:
             raise RuntimeError("Database not initialized")
         
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM files")
-        self.conn.commit()
+        with self._bulk_txn() as cursor:
+            cursor.execute("DELETE FROM files")
+        self._search_blob = None
         logger.info("Index cleared")
     
     def close(self) -> None:
@@ -225,7 +916,7 @@ if __name__ == "__main__":
     print(f"Indexed {count} files")
     
     # Search example
-    results = indexer.search_files("*.py")
+    results = indexer.search_files(".py")
     print(f"Found {len(results)} Python files")
     
     indexer.close()
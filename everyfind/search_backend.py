@@ -19,14 +19,16 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
 import logging
-from typing import Optional, List
-from pathlib import Path
+from itertools import chain, islice
+from typing import Dict, Iterable, Iterator, Optional, List
 
 try:
     from iterfzf import iterfzf
 except ImportError:
     iterfzf = None
 
+from .utils import which
+
 logger = logging.getLogger(__name__)
 
 
@@ -40,10 +42,19 @@ class FzfSearchBackend:
                 "iterfzf (fzf-py) is not installed. "
                 "Install it with: pip install iterfzf"
             )
+        
+        # Options shared by every fzf invocation, resolved once
+        self._base_kwargs = dict(exact=False, case_sensitive=False)
+        # The file preview starts hidden (toggle with Ctrl-/) so fzf does not
+        # run a command for every cursor move; it shows the path field {2}
+        self._preview_cmd = "head -n 200 {2}" if self._has_command("head") else None
+        self._file_extra = ["--delimiter=\t", "--with-nth=1"]
+        if self._preview_cmd:
+            self._file_extra += ["--preview-window=hidden", "--bind=ctrl-/:toggle-preview"]
     
     def search(
         self,
-        items: List[str],
+        items: Iterable[str],
         multi: bool = False,
         prompt: str = "Search: ",
         preview: Optional[str] = None,
@@ -52,8 +63,11 @@ class FzfSearchBackend:
         """
         Perform fuzzy search using fzf.
         
+        Items are streamed to fzf as they are produced, so a generator can
+        feed it without building a list first.
+        
         Args:
-            items: List of items to search through
+            items: Items to search through (any iterable, e.g. a generator)
             multi: Allow multiple selections
             prompt: Prompt text to display
             preview: Preview command (e.g., "cat {}")
@@ -62,19 +76,20 @@ class FzfSearchBackend:
         Returns:
             Selected item(s) or None if cancelled
         """
-        if not items:
+        items = iter(items)
+        first = next(items, None)
+        if first is None:
             logger.warning("No items to search")
             return None
         
         try:
             result = iterfzf(
-                items,
+                chain((first,), items),
                 multi=multi,
                 prompt=prompt,
                 preview=preview,
                 query=query,
-                exact=False,
-                case_sensitive=False
+                **self._base_kwargs
             )
             return result
         except Exception as e:
@@ -83,45 +98,57 @@ class FzfSearchBackend:
     
     def search_files(
         self,
-        file_paths: List[str],
+        file_paths: Iterable[str],
         multi: bool = False,
-        query: str = ""
+        query: str = "",
+        limit: Optional[int] = None
     ) -> Optional[str | List[str]]:
         """
         Search through file paths with optimized display.
         
+        Paths are streamed to fzf lazily so filtering can start before the
+        whole index has been formatted.
+        
         Args:
-            file_paths: List of file paths to search
+            file_paths: File paths to search (any iterable, e.g. a generator)
             multi: Allow multiple selections
             query: Initial query string
+            limit: Maximum number of paths to hand to fzf (None for all)
         
         Returns:
             Selected file path(s) or None if cancelled
         """
-        if not file_paths:
+        paths = iter(file_paths) if limit is None else islice(file_paths, limit)
+        first = next(paths, None)
+        if first is None:
             logger.warning("No file paths to search")
             return None
         
-        # Convert to Path objects for better display
-        display_items = []
-        for path_str in file_paths:
-            path = Path(path_str)
-            # Show filename prominently with directory path
-            display = f"{path.name} ({path.parent})"
-            display_items.append((display, path_str))
+        # Filled while fzf consumes the generator, used to map results back
+        display_to_path: Dict[str, str] = {}
         
-        # Extract display strings for fzf
-        display_list = [item[0] for item in display_items]
+        def display_items() -> Iterator[str]:
+            for path_str in chain((first,), paths):
+                # Show filename prominently with directory path; the path
+                # itself follows in a hidden tab-separated field for preview
+                parent, _, name = path_str.rpartition("/")
+                display = f"{name} ({parent or '/'})"
+                line = f"{display}\t{path_str}"
+                if line in display_to_path:
+                    # Keep lines unique so the reverse lookup stays exact
+                    line = f"{display} [{len(display_to_path)}]\t{path_str}"
+                display_to_path[line] = path_str
+                yield line
         
         try:
             result = iterfzf(
-                display_list,
+                display_items(),
                 multi=multi,
                 prompt="Files: ",
                 query=query,
-                exact=False,
-                case_sensitive=False,
-                preview="cat -n {}" if self._has_command("cat") else None
+                preview=self._preview_cmd,
+                __extra__=self._file_extra,
+                **self._base_kwargs
             )
             
             if result is None:
@@ -129,11 +156,9 @@ class FzfSearchBackend:
             
             # Map back to original paths
             if multi and isinstance(result, list):
-                selected_indices = [display_list.index(r) for r in result]
-                return [display_items[i][1] for i in selected_indices]
+                return [display_to_path[r] for r in result]
             else:
-                selected_index = display_list.index(result)
-                return display_items[selected_index][1]
+                return display_to_path[result]
                 
         except Exception as e:
             logger.error(f"File search error: {e}")
@@ -142,8 +167,7 @@ class FzfSearchBackend:
     @staticmethod
     def _has_command(cmd: str) -> bool:
         """Check if a command is available in PATH."""
-        import shutil
-        return shutil.which(cmd) is not None
+        return which(cmd) is not None
 
 
 class SimpleSearchBackend:
@@ -151,7 +175,7 @@ class SimpleSearchBackend:
     
     def search(
         self,
-        items: List[str],
+        items: Iterable[str],
         multi: bool = False,
         prompt: str = "Search: ",
         query: str = ""
@@ -160,7 +184,7 @@ class SimpleSearchBackend:
         Simple CLI-based search (fallback when fzf is not available).
         
         Args:
-            items: List of items to search through
+            items: Items to search through (collected into a list if needed)
             multi: Allow multiple selections
             prompt: Prompt text to display
             query: Initial query string
@@ -168,6 +192,9 @@ class SimpleSearchBackend:
         Returns:
             Selected item(s) or None if cancelled
         """
+        if not isinstance(items, list):
+            items = list(items)
+        
         if not items:
             return None
         
@@ -178,7 +205,8 @@ class SimpleSearchBackend:
             return None
         
         # Simple case-insensitive substring matching
-        matches = [item for item in items if search_term.lower() in item.lower()]
+        needle = search_term.lower()
+        matches = [item for item in items if needle in item.lower()]
         
         if not matches:
             print("No matches found.")
@@ -19,13 +19,14 @@ along with this program. If not, see <https://www.gnu.org/licenses/>.
 """
 
 import logging
-from pathlib import Path
-from typing import Optional, List
+import queue
+import threading
+from typing import Optional, List, Tuple
 
 try:
     import gi
     gi.require_version('Gtk', '3.0')
-    from gi.repository import Gtk, Gdk, GLib
+    from gi.repository import Gtk, Gdk, GLib, Pango
 except ImportError as e:
     print(f"Error: PyGObject not installed. Install with: pip install PyGObject")
     raise
@@ -35,6 +36,40 @@ from .actions import FileActions
 
 logger = logging.getLogger(__name__)
 
+# Larger indexes are not listed in full on startup or when the search is
+# cleared; the window asks for a query instead
+LOAD_ALL_MAX_FILES = 100000
+
+# Rows added to the TreeView at once; further rows are shown on "Load more"
+MAX_VISIBLE_ROWS = 500
+
+# Rows inserted synchronously before the rest of a batch is added from idle callbacks
+FIRST_PAGE_ROWS = 200
+ROWS_PER_IDLE = 100
+
+# ListStore columns filled per row: index into current_results
+_COLUMNS = [0]
+
+# Sort ids for the filename and directory columns (custom sort functions)
+_SORT_BY_NAME = 1
+_SORT_BY_DIRECTORY = 2
+
+# Delay after the last keystroke before a search is run (milliseconds)
+SEARCH_DEBOUNCE_MS = 100
+
+# GTK_TREE_SORTABLE_UNSORTED_SORT_COLUMN_ID
+_UNSORTED_SORT_COLUMN_ID = -2
+
+
+def _filename_of(path_str: str) -> str:
+    """Return the last component of an absolute path."""
+    return path_str[path_str.rfind("/") + 1:]
+
+
+def _directory_of(path_str: str) -> str:
+    """Return the directory part of an absolute path."""
+    return path_str[:path_str.rfind("/")] or "/"
+
 
 class EveryfindWindow(Gtk.Window):
     """Main GTK window for Everyfind."""
@@ -51,6 +86,15 @@ class EveryfindWindow(Gtk.Window):
         self.indexer = indexer
         self.actions = FileActions()
         self.current_results: List[str] = []
+        self._shown_rows = 0
+        self._batch_end = 0
+        self._fill_idle_id: Optional[int] = None
+        self._search_timeout_id: Optional[int] = None
+        
+        # Searches run on a worker thread; results of superseded queries are dropped
+        self._search_seq = 0
+        self._search_queue: "queue.Queue[Optional[Tuple[int, str]]]" = queue.Queue()
+        threading.Thread(target=self._search_worker, daemon=True).start()
         
         # Window settings
         self.set_default_size(800, 600)
@@ -74,29 +118,46 @@ class EveryfindWindow(Gtk.Window):
         self.result_label = Gtk.Label()
         self.result_label.set_xalign(0)
         
-        # TreeView for results
-        self.store = Gtk.ListStore(str, str)  # filename, full_path
+        # TreeView for results; rows only hold an index into current_results,
+        # filename and directory are split off when a cell is drawn
+        self.store = Gtk.ListStore(int)
+        self.store.set_sort_func(_SORT_BY_NAME, self._compare_rows, _filename_of)
+        self.store.set_sort_func(_SORT_BY_DIRECTORY, self._compare_rows, _directory_of)
         self.tree_view = Gtk.TreeView(model=self.store)
         
-        # Filename column
+        # Fixed column widths and row heights let GTK lay out rows without
+        # measuring every cell; long text is ellipsized instead
         renderer_text = Gtk.CellRendererText()
-        column_filename = Gtk.TreeViewColumn("Filename", renderer_text, text=0)
-        column_filename.set_sort_column_id(0)
+        renderer_text.set_property("ellipsize", Pango.EllipsizeMode.MIDDLE)
+        
+        # Filename column
+        column_filename = Gtk.TreeViewColumn("Filename", renderer_text)
+        column_filename.set_cell_data_func(renderer_text, self._render_cell, _filename_of)
+        column_filename.set_sort_column_id(_SORT_BY_NAME)
+        column_filename.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
+        column_filename.set_fixed_width(300)
         column_filename.set_resizable(True)
         self.tree_view.append_column(column_filename)
         
         # Path column
-        column_path = Gtk.TreeViewColumn("Path", renderer_text, text=1)
-        column_path.set_sort_column_id(1)
+        column_path = Gtk.TreeViewColumn("Path", renderer_text)
+        column_path.set_cell_data_func(renderer_text, self._render_cell, _directory_of)
+        column_path.set_sort_column_id(_SORT_BY_DIRECTORY)
+        column_path.set_sizing(Gtk.TreeViewColumnSizing.FIXED)
         column_path.set_resizable(True)
         column_path.set_expand(True)
         self.tree_view.append_column(column_path)
+        self.tree_view.set_fixed_height_mode(True)
         
         # Scrolled window for TreeView
         self.scrolled_window = Gtk.ScrolledWindow()
         self.scrolled_window.set_vexpand(True)
         self.scrolled_window.add(self.tree_view)
         
+        # Button to show the next batch of results
+        self.load_more_button = Gtk.Button(label="Load more")
+        self.load_more_button.set_no_show_all(True)
+        
         # Status bar
         self.status_bar = Gtk.Statusbar()
         self.status_context = self.status_bar.get_context_id("status")
@@ -134,6 +195,7 @@ class EveryfindWindow(Gtk.Window):
         
         # Results in scrolled window
         vbox.pack_start(self.scrolled_window, True, True, 0)
+        vbox.pack_start(self.load_more_button, False, False, 0)
         
         # Status bar at bottom
         vbox.pack_start(self.status_bar, False, False, 0)
@@ -143,56 +205,213 @@ class EveryfindWindow(Gtk.Window):
     def _connect_signals(self):
         """Connect widget signals to handlers."""
         # Search entry
-        self.search_entry.connect("search-changed", self._on_search_changed)
+        self.search_entry.connect("changed", self._on_search_changed)
         self.search_entry.connect("activate", self._on_search_activate)
         
         # TreeView
         self.tree_view.connect("row-activated", self._on_row_activated)
         self.tree_view.connect("button-press-event", self._on_button_press)
+        self.load_more_button.connect("clicked", self._on_load_more_clicked)
+        self.scrolled_window.connect("edge-reached", self._on_edge_reached)
         
         # Window
-        self.connect("destroy", Gtk.main_quit)
+        self.connect("destroy", self._on_destroy)
         self.connect("key-press-event", self._on_key_press)
+        
+        # Keyboard shortcuts, keyed by (Ctrl state, keyval)
+        ctrl = int(Gdk.ModifierType.CONTROL_MASK)
+        self._key_map = {
+            (ctrl, Gdk.KEY_f): self.search_entry.grab_focus,  # Ctrl+F to focus search
+            (ctrl, Gdk.KEY_q): Gtk.main_quit,                 # Ctrl+Q to quit
+            (0, Gdk.KEY_Escape): self._clear_search,          # ESC to clear search
+            (ctrl, Gdk.KEY_Escape): self._clear_search,
+        }
     
     def _load_all_files(self):
-        """Load all files from the index."""
-        try:
-            paths = self.indexer.get_all_paths()
-            self._update_results(paths)
-        except Exception as e:
-            logger.error(f"Failed to load files: {e}")
-            self._show_status(f"Error loading files: {e}")
+        """Load all files from the index on the search worker."""
+        self.result_label.set_text("Loading…")
+        self._start_search("")
     
     def _update_results(self, paths: List[str]):
         """Update the TreeView with search results."""
+        self._cancel_pending_rows()
+        self.tree_view.set_model(None)
         self.store.clear()
         self.current_results = paths
-        
-        for path_str in paths:
-            path = Path(path_str)
-            self.store.append([path.name, str(path.parent)])
+        self._shown_rows = 0
         
         # Update result label
-        count = len(paths)
-        self.result_label.set_text(f"Results: {count}")
+        self.result_label.set_text(f"Results: {len(paths)}")
+        
+        self._show_more_rows()
+    
+    def _show_more_rows(self):
+        """
+        Show the next batch of at most MAX_VISIBLE_ROWS results.
         
-        self._show_status(f"Showing {count} files")
+        The first page is inserted right away so the list repaints quickly,
+        the remainder of the batch is added from idle callbacks.
+        """
+        self._batch_end = min(self._shown_rows + MAX_VISIBLE_ROWS, len(self.current_results))
+        self.load_more_button.set_visible(False)
+        
+        self._insert_rows(self._shown_rows + FIRST_PAGE_ROWS)
+        if self.tree_view.get_model() is None:
+            self.tree_view.set_model(self.store)
+        
+        if self._shown_rows < self._batch_end:
+            self._fill_idle_id = GLib.idle_add(self._insert_next_rows)
+        else:
+            self._finish_batch()
+    
+    def _insert_next_rows(self) -> bool:
+        """Idle callback: insert the next chunk of the current batch."""
+        self._insert_rows(self._shown_rows + ROWS_PER_IDLE)
+        if self._shown_rows < self._batch_end:
+            return True
+        
+        self._fill_idle_id = None
+        self._finish_batch()
+        return False
+    
+    def _insert_rows(self, end: int):
+        """Append results up to index end (capped at the current batch)."""
+        start = self._shown_rows
+        end = min(end, self._batch_end)
+        
+        # While the model is detached (first page of new results), fill it
+        # unsorted and sort once. Once it is shown, restoring the sort column
+        # would re-sort every row, so rows are inserted in sorted position
+        detached = self.tree_view.get_model() is None
+        sort_column, sort_order = self.store.get_sort_column_id()
+        if detached and sort_column is not None:
+            self.store.set_sort_column_id(_UNSORTED_SORT_COLUMN_ID, Gtk.SortType.ASCENDING)
+        
+        for i in range(start, end):
+            self.store.insert_with_valuesv(-1, _COLUMNS, [i])
+        
+        if detached and sort_column is not None:
+            self.store.set_sort_column_id(sort_column, sort_order)
+        
+        self._shown_rows = end
+    
+    def _finish_batch(self):
+        """Update controls once a batch of rows is fully inserted."""
+        self.load_more_button.set_visible(self._shown_rows < len(self.current_results))
+        self._show_status(f"Showing {self._shown_rows} of {len(self.current_results)} files")
+    
+    def _cancel_pending_rows(self):
+        """Stop inserting rows of a batch that is still being filled."""
+        if self._fill_idle_id is not None:
+            GLib.source_remove(self._fill_idle_id)
+            self._fill_idle_id = None
+    
+    def _render_cell(self, column, cell, model, tree_iter, part):
+        """Cell data function: show one part of the row's path."""
+        path_str = self.current_results[model.get_value(tree_iter, 0)]
+        cell.set_property("text", part(path_str))
+    
+    def _compare_rows(self, model, iter_a, iter_b, part) -> int:
+        """Sort function: compare two rows by one part of their paths."""
+        a = part(self.current_results[model.get_value(iter_a, 0)])
+        b = part(self.current_results[model.get_value(iter_b, 0)])
+        return (a > b) - (a < b)
+    
+    def _on_load_more_clicked(self, button: Gtk.Button):
+        """Handle click on the "Load more" button."""
+        self._show_more_rows()
+    
+    def _on_edge_reached(self, scrolled_window: Gtk.ScrolledWindow, pos: Gtk.PositionType):
+        """Show the next batch when the list is scrolled to the bottom."""
+        if (pos == Gtk.PositionType.BOTTOM and self._fill_idle_id is None
+                and self._shown_rows < len(self.current_results)):
+            self._show_more_rows()
     
     def _on_search_changed(self, entry: Gtk.SearchEntry):
-        """Handle search text changes."""
-        search_text = entry.get_text().strip()
+        """Handle search text changes (debounced)."""
+        self._cancel_pending_search()
+        self._search_timeout_id = GLib.timeout_add(
+            SEARCH_DEBOUNCE_MS, self._do_search, entry.get_text().strip()
+        )
+    
+    def _cancel_pending_search(self):
+        """Remove a scheduled but not yet started search."""
+        if self._search_timeout_id is not None:
+            GLib.source_remove(self._search_timeout_id)
+            self._search_timeout_id = None
+    
+    def _do_search(self, search_text: str) -> bool:
+        """Start a search once typing has paused."""
+        self._search_timeout_id = None
         
         if not search_text:
             self._load_all_files()
-            return
-        
+        else:
+            self._start_search(search_text)
+        return False
+    
+    def _start_search(self, search_text: str):
+        """Queue a search for the worker; an empty text lists all files."""
+        self._search_seq += 1
+        self._search_queue.put((self._search_seq, search_text))
+    
+    def _search_worker(self):
+        """Run queued searches off the main loop (SQLite needs a per-thread connection)."""
+        # Opened with the first job and retried with the next one if that
+        # fails, so an unavailable database does not stop the worker
+        indexer = None
         try:
-            # Search in database
-            results = self.indexer.search_files(search_text)
+            while True:
+                job = self._search_queue.get()
+                if job is None:
+                    break
+                
+                seq, search_text = job
+                if seq != self._search_seq:
+                    continue
+                
+                try:
+                    if indexer is None:
+                        indexer = FileIndexer(self.indexer.db_path)
+                    
+                    if search_text:
+                        results = indexer.search_files(search_text)
+                    else:
+                        count = indexer.count_files()
+                        if count > LOAD_ALL_MAX_FILES:
+                            GLib.idle_add(self._show_index_size, seq, count)
+                            continue
+                        results = indexer.get_all_paths()
+                except Exception as e:
+                    logger.error(f"Search failed: {e}")
+                    GLib.idle_add(self._show_search_error, seq, e)
+                    continue
+                
+                GLib.idle_add(self._apply_search_results, seq, results)
+        finally:
+            if indexer is not None:
+                indexer.close()
+    
+    def _apply_search_results(self, seq: int, results: List[str]) -> bool:
+        """Show results of a finished search unless a newer one was started."""
+        if seq == self._search_seq:
             self._update_results(results)
-        except Exception as e:
-            logger.error(f"Search failed: {e}")
-            self._show_status(f"Search error: {e}")
+        return False
+    
+    def _show_index_size(self, seq: int, count: int) -> bool:
+        """Show the size of a large index instead of listing all of it."""
+        if seq == self._search_seq:
+            self._update_results([])
+            self.result_label.set_text("Type to search…")
+            self._show_status(f"{count} files indexed")
+        return False
+    
+    def _show_search_error(self, seq: int, error: Exception) -> bool:
+        """Report a failed search unless a newer one was started."""
+        if seq == self._search_seq:
+            self.result_label.set_text("Search failed")
+            self._show_status(f"Search error: {error}")
+        return False
     
     def _on_search_activate(self, entry: Gtk.SearchEntry):
         """Handle Enter key in search entry."""
@@ -207,8 +426,7 @@ class EveryfindWindow(Gtk.Window):
         iter = model.get_iter(path)
         
         if iter:
-            row_index = path.get_indices()[0]
-            file_path = self.current_results[row_index]
+            file_path = self.current_results[model.get_value(iter, 0)]
             
             if self.actions.open_file(file_path):
                 self._show_status(f"Opened: {file_path}")
@@ -228,25 +446,28 @@ class EveryfindWindow(Gtk.Window):
         
         return False
     
+    def _on_destroy(self, widget):
+        """Handle window close."""
+        self._cancel_pending_search()
+        self._cancel_pending_rows()
+        self._search_queue.put(None)
+        Gtk.main_quit()
+    
     def _on_key_press(self, widget, event: Gdk.EventKey):
         """Handle keyboard shortcuts."""
-        # Ctrl+F to focus search
-        if event.state & Gdk.ModifierType.CONTROL_MASK:
-            if event.keyval == Gdk.KEY_f:
-                self.search_entry.grab_focus()
-                return True
-            # Ctrl+Q to quit
-            elif event.keyval == Gdk.KEY_q:
-                Gtk.main_quit()
-                return True
-        
-        # ESC to clear search
-        if event.keyval == Gdk.KEY_Escape:
-            self.search_entry.set_text("")
-            self.search_entry.grab_focus()
-            return True
+        handler = self._key_map.get(
+            (int(event.state & Gdk.ModifierType.CONTROL_MASK), event.keyval)
+        )
+        if handler is None:
+            return False
         
-        return False
+        handler()
+        return True
+    
+    def _clear_search(self):
+        """Clear the search entry and focus it."""
+        self.search_entry.set_text("")
+        self.search_entry.grab_focus()
     
     def _get_selected_path(self) -> Optional[str]:
         """Get the currently selected file path."""
@@ -254,9 +475,7 @@ class EveryfindWindow(Gtk.Window):
         model, iter = selection.get_selected()
         
         if iter:
-            path = model.get_path(iter)
-            row_index = path.get_indices()[0]
-            return self.current_results[row_index]
+            return self.current_results[model.get_value(iter, 0)]
         
         return None
     
@@ -282,10 +501,11 @@ class EveryfindWindow(Gtk.Window):
         """Menu: Copy path to clipboard."""
         path = self._get_selected_path()
         if path:
-            if self.actions.copy_path_to_clipboard(path):
-                self._show_status(f"Copied: {path}")
-            else:
-                self._show_status("Failed to copy path (install xclip or xsel)")
+            # Use the GTK clipboard directly instead of spawning xclip/xsel
+            clipboard = Gtk.Clipboard.get(Gdk.SELECTION_CLIPBOARD)
+            clipboard.set_text(path, -1)
+            clipboard.store()
+            self._show_status(f"Copied: {path}")
     
     def _on_menu_show_details(self, menu_item):
         """Menu: Show file details."""
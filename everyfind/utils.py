@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Everyfind - Shared Helpers
+Copyright (C) 2025 Stefan
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program. If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import shutil
+import functools
+from typing import Optional
+
+
+@functools.lru_cache(maxsize=64)
+def which(cmd: str) -> Optional[str]:
+    """
+    Look up a command in PATH (cached for the lifetime of the process).
+    
+    Args:
+        cmd: Command name
+    
+    Returns:
+        Full path of the command, or None if it is not installed
+    """
+    return shutil.which(cmd)